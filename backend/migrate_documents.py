@@ -0,0 +1,71 @@
+"""Normaliza documentos existentes para os modelos Equipamento/Manutencao.
+
+Uso:
+    python migrate_documents.py [--dry-run]
+
+Converte datas gravadas como string para datetime, remove campos fora do
+modelo e atualiza ``updated_at`` dos documentos alterados (para que clientes
+de sincronização recebam a versão normalizada). Campos ausentes continuam
+ausentes: os valores padrão dos modelos não são gravados. Documentos que não
+passam na validação são apenas listados, nunca alterados.
+"""
+import argparse
+import asyncio
+from datetime import datetime
+
+from pydantic import ValidationError
+from pymongo import ReplaceOne
+
+from server import CAMPOS_SISTEMA, Equipamento, Manutencao, colecoes_manutencoes, db, parse_data
+
+LOTE = 500
+
+
+def normalizar(documento: dict, modelo):
+    dados = {campo: valor for campo, valor in documento.items() if campo in modelo.model_fields}
+    # exclude_unset: não inventar status/tipo padrão para documentos legados
+    normalizado = modelo.model_validate(dados).model_dump(exclude_unset=True, exclude_none=True)
+    for campo in CAMPOS_SISTEMA:
+        if campo in documento:
+            normalizado[campo] = documento[campo]
+    for campo in ("created_at", "updated_at"):
+        if campo in normalizado:
+            normalizado[campo] = parse_data(normalizado[campo]) or normalizado[campo]
+    normalizado["_id"] = documento["_id"]
+    return normalizado
+
+
+async def migrar_colecao(colecao, modelo, dry_run: bool):
+    alterados, invalidos, operacoes = 0, 0, []
+    async for documento in colecao.find({}):
+        try:
+            normalizado = normalizar(documento, modelo)
+        except ValidationError as e:
+            invalidos += 1
+            print(f"  inválido {documento.get('id', documento['_id'])}: {e.error_count()} erro(s)")
+            continue
+        if normalizado == documento:
+            continue
+        alterados += 1
+        normalizado["updated_at"] = datetime.utcnow()
+        operacoes.append(ReplaceOne({"_id": documento["_id"]}, normalizado))
+        if len(operacoes) >= LOTE:
+            if not dry_run:
+                await colecao.bulk_write(operacoes, ordered=False)
+            operacoes = []
+    if operacoes and not dry_run:
+        await colecao.bulk_write(operacoes, ordered=False)
+    print(f"{colecao.name}: {alterados} normalizado(s), {invalidos} inválido(s)")
+
+
+async def main(dry_run: bool):
+    await migrar_colecao(db.equipamentos, Equipamento, dry_run)
+    for colecao in await colecoes_manutencoes(datetime.min):
+        await migrar_colecao(colecao, Manutencao, dry_run)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="apenas relata o que seria alterado")
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run))
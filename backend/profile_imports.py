@@ -0,0 +1,63 @@
+"""Mede o custo de importação do backend e falha se passar do orçamento.
+
+Uso:
+    python profile_imports.py [--budget-ms 1500] [--top 20] [--module server]
+
+Executa ``python -X importtime`` em um processo novo (cache de módulos frio),
+lista os módulos mais caros pelo tempo acumulado e retorna código 1 quando o
+tempo total de importação excede o orçamento.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+
+def medir_importacao(modulo: str):
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    if resultado.returncode != 0:
+        sys.stderr.write(resultado.stderr)
+        raise SystemExit(f"Falha ao importar {modulo}")
+
+    # Formato: "import time: self [us] | cumulative | imported package"
+    modulos = []
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        _, valores = linha.split(":", 1)
+        proprio, acumulado, nome = valores.split("|", 2)
+        modulos.append((nome[1:].rstrip(), int(proprio), int(acumulado)))
+    return modulos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--module", default="server")
+    args = parser.parse_args()
+
+    modulos = medir_importacao(args.module)
+    # Módulos de primeiro nível (sem indentação) somam o custo total
+    total_ms = sum(acumulado for nome, _, acumulado in modulos if not nome.startswith(" ")) / 1000
+
+    print(f"{'acumulado (ms)':>15} {'próprio (ms)':>13}  módulo")
+    for nome, proprio, acumulado in sorted(modulos, key=lambda m: m[2], reverse=True)[:args.top]:
+        print(f"{acumulado / 1000:>15.1f} {proprio / 1000:>13.1f}  {nome.strip()}")
+    print(f"\nTotal: {total_ms:.1f} ms (orçamento: {args.budget_ms:.0f} ms)")
+
+    if total_ms > args.budget_ms:
+        print("Orçamento de importação excedido", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
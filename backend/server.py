@@ -1,20 +1,136 @@
 import sys
 import os
-from fastapi import FastAPI, Depends, HTTPException, status
+import asyncio
+import hashlib
+import json
+import time
+import base64
+import heapq
+import itertools
+import queue
+import threading
+import contextvars
+import logging.handlers
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import datetime, timedelta
-from typing import Optional
+from pymongo import monitoring
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, Optional, Dict, Any, List
+from functools import lru_cache
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from pydantic import BaseModel
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
 import uuid
 import uvicorn
 import logging
 
 # Configuração de logging
-logging.basicConfig(level=logging.INFO)
+# Os handlers rodam em uma thread separada (QueueListener); o event loop apenas
+# enfileira o LogRecord, sem formatar nem escrever em stdout.
+LOG_FILA_MAXIMA = int(os.getenv("LOG_FILA_MAXIMA", "10000"))
+LOG_LIMITE_POR_MENSAGEM = int(os.getenv("LOG_LIMITE_POR_MENSAGEM", "20"))
+LOG_JANELA_SEGUNDOS = float(os.getenv("LOG_JANELA_SEGUNDOS", "10"))
+
+request_id_var: contextvars.ContextVar = contextvars.ContextVar("request_id", default=None)
+rota_var: contextvars.ContextVar = contextvars.ContextVar("rota", default=None)
+
+logs_descartados = {"fila_cheia": 0, "limite_taxa": 0}
+logs_descartados_lock = threading.Lock()
+
+def contar_log_descartado(motivo: str):
+    # Chamado de qualquer thread que emita logs
+    with logs_descartados_lock:
+        logs_descartados[motivo] += 1
+
+class JSONLogFormatter(logging.Formatter):
+    def format(self, record):
+        evento = {
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat() + "Z",
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensagem": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "rota": getattr(record, "rota", None),
+        }
+        if record.exc_info:
+            evento["excecao"] = self.formatException(record.exc_info)
+        return json.dumps(evento, ensure_ascii=False, default=str)
+
+class ContextoLogFilter(logging.Filter):
+    """Anexa request id e rota ao registro ainda na thread da requisição."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        record.rota = rota_var.get()
+        return True
+
+class LimiteTaxaLogFilter(logging.Filter):
+    """Limita quantos registros do mesmo template passam por janela de tempo.
+
+    Loggers em ``isentos`` não são limitados: o access log do uvicorn usa um
+    único template para todas as requisições.
+    """
+
+    def __init__(self, limite: int, janela: float, isentos: tuple = ("uvicorn.access",)):
+        super().__init__()
+        self.limite = limite
+        self.janela = janela
+        self.isentos = isentos
+        self.contagens: Dict[Any, tuple] = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.name in self.isentos:
+            return True
+        chave = (record.name, record.levelno, record.msg)
+        agora = record.created
+        with self.lock:
+            inicio, contagem = self.contagens.get(chave, (agora, 0))
+            if agora - inicio >= self.janela:
+                inicio, contagem = agora, 0
+            self.contagens[chave] = (inicio, contagem + 1)
+        if contagem >= self.limite:
+            contar_log_descartado("limite_taxa")
+            return False
+        return True
+
+class FilaLogHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Formatação adiada para a thread do listener
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            contar_log_descartado("fila_cheia")
+
+def configurar_logging() -> logging.handlers.QueueListener:
+    saida = logging.StreamHandler(sys.stdout)
+    saida.setFormatter(JSONLogFormatter())
+    fila = queue.Queue(maxsize=LOG_FILA_MAXIMA)
+    handler = FilaLogHandler(fila)
+    handler.addFilter(ContextoLogFilter())
+    handler.addFilter(LimiteTaxaLogFilter(LOG_LIMITE_POR_MENSAGEM, LOG_JANELA_SEGUNDOS))
+
+    raiz = logging.getLogger()
+    raiz.handlers = [handler]
+    raiz.setLevel(logging.INFO)
+    # O uvicorn configura seus loggers (com StreamHandler síncrono e
+    # propagate=False) antes de importar a aplicação; redirecioná-los para a fila
+    for nome in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(nome)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    listener = logging.handlers.QueueListener(fila, saida, respect_handler_level=True)
+    listener.start()
+    return listener
+
+log_listener = configurar_logging()
 logger = logging.getLogger(__name__)
 
 # Configurações de segurança
@@ -37,8 +153,66 @@ class User(BaseModel):
 class UserInDB(User):
     hashed_password: str
 
+# Modelos de documentos
+def para_utc(valor: datetime) -> datetime:
+    # MongoDB guarda datetimes em UTC sem fuso; normalizar antes de gravar/comparar
+    if valor.tzinfo is not None:
+        return valor.astimezone(timezone.utc).replace(tzinfo=None)
+    return valor
+
+DataUTC = Annotated[datetime, AfterValidator(para_utc)]
+TextoCurto = Annotated[str, Field(max_length=200)]
+TextoLongo = Annotated[str, Field(max_length=5000)]
+
+class Equipamento(BaseModel):
+    # Campos desconhecidos são descartados em vez de gravados
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
+    nome: TextoCurto
+    tipo: Optional[TextoCurto] = None
+    modelo: Optional[TextoCurto] = None
+    numero_serie: Optional[TextoCurto] = None
+    fabricante: Optional[TextoCurto] = None
+    data_aquisicao: Optional[DataUTC] = None
+    data_ultima_manutencao: Optional[DataUTC] = None
+    status: TextoCurto = "ativo"
+    localizacao: Optional[TextoCurto] = None
+    departamento: Optional[TextoCurto] = None
+
+class Manutencao(BaseModel):
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
+    equipamento_id: TextoCurto
+    tipo: TextoCurto = "preventiva"
+    descricao: Optional[TextoLongo] = None
+    data_abertura: Optional[DataUTC] = None
+    data_agendada: Optional[DataUTC] = None
+    data_prevista: Optional[DataUTC] = None
+    data_conclusao: Optional[DataUTC] = None
+    status: TextoCurto = "pendente"
+    tecnico: Optional[TextoCurto] = None
+    custo: Optional[float] = Field(default=None, ge=0)
+    observacoes: Optional[TextoLongo] = None
+
+CAMPOS_SISTEMA = ("id", "created_at", "updated_at", "created_by")
+LOTE_MAXIMO = 1000
+
+def projecao_modelo(modelo) -> dict:
+    # Projeção no MongoDB: somente campos do modelo e de controle
+    return {"_id": 0, **{campo: 1 for campo in (*modelo.model_fields, *CAMPOS_SISTEMA)}}
+
+EQUIPAMENTO_PROJECAO = projecao_modelo(Equipamento)
+MANUTENCAO_PROJECAO = projecao_modelo(Manutencao)
+equipamentos_adapter = TypeAdapter(List[Equipamento])
+manutencoes_adapter = TypeAdapter(List[Manutencao])
+
 # Configuração de criptografia de senha
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib/bcrypt são importados no primeiro uso para não pesar na inicialização
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login")
 
 # Inicialização da aplicação FastAPI
@@ -53,17 +227,89 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def contexto_requisicao(request: Request, call_next):
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    request_id_var.set(request_id)
+    rota_var.set(f"{request.method} {request.url.path}")
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+@app.on_event("shutdown")
+async def parar_logging():
+    log_listener.stop()
+
 # Conexão com MongoDB
 MONGO_URI = os.getenv("MONGO_URL", "mongodb://localhost:27017")
-client = AsyncIOMotorClient(MONGO_URI)
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Conta conexões por servidor do MongoDB para o readiness.
+
+    O pymongo chama os métodos a partir de threads do driver/executor, por
+    isso os contadores ficam protegidos por lock. Cada servidor tem seu próprio
+    pool de até max_pool_size conexões.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.em_uso: Dict[Any, int] = {}
+        self.abertas: Dict[Any, int] = {}
+
+    def _ajustar(self, contadores: dict, endereco, delta: int):
+        with self.lock:
+            contadores[endereco] = max(contadores.get(endereco, 0) + delta, 0)
+
+    def connection_checked_out(self, event):
+        self._ajustar(self.em_uso, event.address, 1)
+
+    def connection_checked_in(self, event):
+        self._ajustar(self.em_uso, event.address, -1)
+
+    def connection_created(self, event):
+        self._ajustar(self.abertas, event.address, 1)
+
+    def connection_closed(self, event):
+        self._ajustar(self.abertas, event.address, -1)
+
+    def pool_cleared(self, event):
+        with self.lock:
+            self.em_uso[event.address] = 0
+
+    def pool_closed(self, event):
+        with self.lock:
+            self.em_uso.pop(event.address, None)
+            self.abertas.pop(event.address, None)
+
+    def resumo(self, tamanho_pool: int) -> dict:
+        with self.lock:
+            em_uso = dict(self.em_uso)
+            abertas = sum(self.abertas.values())
+        # Saturação do pool mais ocupado: a média entre servidores esconderia o gargalo
+        maior = max(em_uso.values(), default=0)
+        return {
+            "em_uso": sum(em_uso.values()),
+            "abertas": abertas,
+            "maximo_por_servidor": tamanho_pool,
+            "saturacao": round(maior / tamanho_pool, 4) if tamanho_pool else None,
+        }
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_check_out_started(self, event): pass
+    def connection_check_out_failed(self, event): pass
+
+pool_monitor = PoolMonitor()
+client = AsyncIOMotorClient(MONGO_URI, event_listeners=[pool_monitor])
 db = client.equipamentos_db
 
 # Funções de autenticação
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -106,6 +352,51 @@ async def get_current_active_user(current_user = Depends(get_current_user)):
         raise HTTPException(status_code=400, detail="Usuário inativo")
     return current_user
 
+def parse_data(valor) -> Optional[datetime]:
+    # Documentos anteriores aos modelos podem ter datas como string ISO
+    if isinstance(valor, datetime):
+        return para_utc(valor)
+    if isinstance(valor, str) and valor:
+        try:
+            return para_utc(datetime.fromisoformat(valor.replace("Z", "+00:00")))
+        except ValueError:
+            return None
+    return None
+
+tarefas_inicializacao: list = []
+
+def executar_em_segundo_plano(nome: str, fabrica):
+    """Agenda uma etapa de inicialização que depende do MongoDB.
+
+    O startup do uvicorn não espera por ela (liveness responde mesmo com o
+    banco fora) e a etapa é repetida com backoff até conseguir.
+    """
+    async def executar():
+        espera = 1
+        while True:
+            try:
+                await fabrica()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Erro na inicialização de %s (nova tentativa em %ds): %s", nome, espera, e)
+                await asyncio.sleep(espera)
+                espera = min(espera * 2, 60)
+
+    tarefas_inicializacao.append(asyncio.create_task(executar()))
+
+@app.on_event("shutdown")
+async def parar_tarefas_inicializacao():
+    for tarefa in tarefas_inicializacao:
+        tarefa.cancel()
+
+def novo_documento(modelo: BaseModel, username: str) -> dict:
+    agora = datetime.utcnow()
+    documento = modelo.model_dump(exclude_none=True)
+    documento.update({"id": str(uuid.uuid4()), "created_at": agora, "updated_at": agora, "created_by": username})
+    return documento
+
 # Endpoint raiz
 @app.get("/api/")
 async def root():
@@ -182,166 +473,1141 @@ async def read_users_me(current_user = Depends(get_current_active_user)):
         "disabled": current_user.get("disabled", False)
     }
 
-# Endpoint de health check
-@app.get("/api/health", tags=["Sistema"])
-async def health_check():
+# Endpoints de health check
+# Liveness responde sem tocar em dependências; readiness serve o último
+# resultado do verificador em segundo plano, então sondas nunca geram carga no
+# MongoDB nem ficam presas na seleção de servidor.
+HEALTH_INTERVALO_SEGUNDOS = float(os.getenv("HEALTH_INTERVALO_SEGUNDOS", "5"))
+HEALTH_TIMEOUT_SEGUNDOS = float(os.getenv("HEALTH_TIMEOUT_SEGUNDOS", "2"))
+
+health_estado: Dict[str, Any] = {"status": "starting", "database": "unknown", "timestamp": None}
+
+# Cliente próprio para o ping: wait_for não cancela a chamada do pymongo na
+# thread do motor, então o timeout de seleção de servidor precisa ser curto
+health_client = AsyncIOMotorClient(
+    MONGO_URI,
+    serverSelectionTimeoutMS=int(HEALTH_TIMEOUT_SEGUNDOS * 1000),
+    connectTimeoutMS=int(HEALTH_TIMEOUT_SEGUNDOS * 1000),
+    socketTimeoutMS=int(HEALTH_TIMEOUT_SEGUNDOS * 1000),
+    maxPoolSize=1,
+)
+health_task: Optional[asyncio.Task] = None
+
+async def verificar_dependencias(lag_loop_ms: float):
+    inicio = time.perf_counter()
     try:
-        # Testar conexão com MongoDB
-        await client.admin.command('ping')
-        return {
-            "status": "ok",
-            "timestamp": datetime.utcnow().isoformat(),
-            "database": "connected"
-        }
+        await asyncio.wait_for(health_client.admin.command("ping"), timeout=HEALTH_TIMEOUT_SEGUNDOS + 1)
+        latencia_ms, database, erro = (time.perf_counter() - inicio) * 1000, "connected", None
     except Exception as e:
-        return {
-            "status": "error",
-            "timestamp": datetime.utcnow().isoformat(),
-            "database": "disconnected",
-            "error": str(e)
-        }
+        latencia_ms, database, erro = None, "disconnected", str(e) or type(e).__name__
+    tamanho_pool = client.options.pool_options.max_pool_size
+    health_estado.update({
+        "status": "ok" if database == "connected" else "error",
+        "timestamp": datetime.utcnow().isoformat(),
+        "verificado_em": time.monotonic(),
+        "database": database,
+        "mongo_latencia_ms": round(latencia_ms, 2) if latencia_ms is not None else None,
+        "pool": pool_monitor.resumo(tamanho_pool),
+        "event_loop_lag_ms": round(lag_loop_ms, 2),
+        "error": erro,
+    })
+
+async def ciclo_health():
+    lag_ms = 0.0
+    while True:
+        await verificar_dependencias(lag_ms)
+        # O atraso além do intervalo pedido mede o quanto o event loop está ocupado
+        inicio = time.monotonic()
+        await asyncio.sleep(HEALTH_INTERVALO_SEGUNDOS)
+        lag_ms = max(time.monotonic() - inicio - HEALTH_INTERVALO_SEGUNDOS, 0) * 1000
+
+@app.on_event("startup")
+async def iniciar_health():
+    global health_task
+    health_task = asyncio.create_task(ciclo_health())
+
+@app.on_event("shutdown")
+async def parar_health():
+    if health_task:
+        health_task.cancel()
+    health_client.close()
+
+def estado_readiness() -> dict:
+    estado = {k: v for k, v in health_estado.items() if k != "verificado_em"}
+    verificado_em = health_estado.get("verificado_em")
+    if verificado_em is not None and time.monotonic() - verificado_em > 3 * HEALTH_INTERVALO_SEGUNDOS:
+        # Verificador travado também torna o pod não pronto
+        estado["status"] = "error"
+        estado["error"] = "Verificação de saúde desatualizada"
+    estado["logs_descartados"] = logs_descartados
+    return estado
+
+@app.get("/api/health/live", tags=["Sistema"])
+async def health_live():
+    return {"status": "ok"}
+
+@app.get("/api/health/ready", tags=["Sistema"])
+async def health_ready(response: Response):
+    estado = estado_readiness()
+    if estado["status"] != "ok":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return estado
+
+@app.get("/api/health", tags=["Sistema"])
+async def health_check():
+    # Mantido por compatibilidade: mesmo resultado em cache do readiness, sempre 200
+    return estado_readiness()
 
 # Endpoints para equipamentos
 @app.get("/api/equipamentos", tags=["Equipamentos"])
 async def listar_equipamentos(current_user = Depends(get_current_active_user)):
     try:
-        equipamentos = await db.equipamentos.find().to_list(1000)
-        # Converter ObjectId para string se necessário
-        for equipamento in equipamentos:
-            if "_id" in equipamento:
-                del equipamento["_id"]
+        equipamentos = await db.equipamentos.find({}, EQUIPAMENTO_PROJECAO).to_list(1000)
         return {"equipamentos": equipamentos, "total": len(equipamentos)}
     except Exception as e:
-        logger.error(f"Erro ao listar equipamentos: {e}")
+        logger.error("Erro ao listar equipamentos: %s", e)
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
 @app.post("/api/equipamentos", tags=["Equipamentos"], status_code=201)
-async def criar_equipamento(equipamento: dict, current_user = Depends(get_current_active_user)):
+async def criar_equipamento(equipamento: Equipamento, current_user = Depends(get_current_active_user)):
     try:
-        equipamento["id"] = str(uuid.uuid4())
-        equipamento["created_at"] = datetime.utcnow()
-        equipamento["updated_at"] = datetime.utcnow()
-        equipamento["created_by"] = current_user["username"]
-        
-        await db.equipamentos.insert_one(equipamento)
+        documento = novo_documento(equipamento, current_user["username"])
+        await db.equipamentos.insert_one(documento)
         
         # Remover _id do MongoDB antes de retornar
-        if "_id" in equipamento:
-            del equipamento["_id"]
+        del documento["_id"]
             
-        return {"message": "Equipamento criado com sucesso", "equipamento": equipamento}
+        return {"message": "Equipamento criado com sucesso", "equipamento": documento}
+    except Exception as e:
+        logger.error("Erro ao criar equipamento: %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+@app.post("/api/equipamentos/lote", tags=["Equipamentos"], status_code=201)
+async def criar_equipamentos_lote(equipamentos: List[Dict[str, Any]], current_user = Depends(get_current_active_user)):
+    if len(equipamentos) > LOTE_MAXIMO:
+        raise HTTPException(status_code=413, detail=f"Máximo de {LOTE_MAXIMO} equipamentos por lote")
+    # Validação do lote inteiro em uma única chamada ao núcleo do pydantic
+    try:
+        modelos = equipamentos_adapter.validate_python(equipamentos)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=jsonable_encoder(e.errors(include_url=False)))
+    try:
+        documentos = [novo_documento(modelo, current_user["username"]) for modelo in modelos]
+        if documentos:
+            await db.equipamentos.insert_many(documentos)
+        for documento in documentos:
+            del documento["_id"]
+        return {"message": "Equipamentos criados com sucesso", "equipamentos": documentos, "total": len(documentos)}
+    except Exception as e:
+        logger.error("Erro ao criar lote de equipamentos: %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+@app.delete("/api/equipamentos/{equipamento_id}", tags=["Equipamentos"])
+async def remover_equipamento(equipamento_id: str, current_user = Depends(get_current_active_user)):
+    try:
+        resultado = await db.equipamentos.delete_one({"id": equipamento_id})
+        if resultado.deleted_count == 0:
+            raise HTTPException(status_code=404, detail="Equipamento não encontrado")
+        await registrar_tombstone("equipamentos", equipamento_id, current_user["username"])
+        return {"message": "Equipamento removido com sucesso"}
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Erro ao criar equipamento: {e}")
+        logger.error("Erro ao remover equipamento: %s", e)
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
 # Endpoints para manutenções
 @app.get("/api/manutencoes", tags=["Manutenções"])
-async def listar_manutencoes(current_user = Depends(get_current_active_user)):
+async def listar_manutencoes(
+    desde: Optional[datetime] = None,
+    ate: Optional[datetime] = None,
+    current_user = Depends(get_current_active_user),
+):
     try:
-        manutencoes = await db.manutencoes.find().to_list(1000)
-        for manutencao in manutencoes:
-            if "_id" in manutencao:
-                del manutencao["_id"]
+        desde = para_utc(desde) if desde else None
+        ate = para_utc(ate) if ate else None
+        filtro = {}
+        if desde or ate:
+            filtro["created_at"] = {}
+            if desde:
+                filtro["created_at"]["$gte"] = desde
+            if ate:
+                filtro["created_at"]["$lte"] = ate
+        # O arquivo só é consultado quando o intervalo pedido alcança registros arquivados
+        manutencoes = []
+        for colecao in await colecoes_manutencoes(desde, ate):
+            manutencoes.extend(await colecao.find(filtro, MANUTENCAO_PROJECAO).to_list(1000 - len(manutencoes)))
+            if len(manutencoes) >= 1000:
+                break
         return {"manutencoes": manutencoes, "total": len(manutencoes)}
     except Exception as e:
-        logger.error(f"Erro ao listar manutenções: {e}")
+        logger.error("Erro ao listar manutenções: %s", e)
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
 @app.post("/api/manutencoes", tags=["Manutenções"], status_code=201)
-async def criar_manutencao(manutencao: dict, current_user = Depends(get_current_active_user)):
+async def criar_manutencao(manutencao: Manutencao, current_user = Depends(get_current_active_user)):
     try:
-        manutencao["id"] = str(uuid.uuid4())
-        manutencao["created_at"] = datetime.utcnow()
-        manutencao["updated_at"] = datetime.utcnow()
-        manutencao["created_by"] = current_user["username"]
+        documento = novo_documento(manutencao, current_user["username"])
+        await db.manutencoes.insert_one(documento)
+        await registrar_rollup_manutencao(documento)
+        agendar_notificacao(documento)
         
-        await db.manutencoes.insert_one(manutencao)
-        
-        if "_id" in manutencao:
-            del manutencao["_id"]
+        del documento["_id"]
             
-        return {"message": "Manutenção criada com sucesso", "manutencao": manutencao}
+        return {"message": "Manutenção criada com sucesso", "manutencao": documento}
     except Exception as e:
-        logger.error(f"Erro ao criar manutenção: {e}")
+        logger.error("Erro ao criar manutenção: %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+@app.post("/api/manutencoes/lote", tags=["Manutenções"], status_code=201)
+async def criar_manutencoes_lote(manutencoes: List[Dict[str, Any]], current_user = Depends(get_current_active_user)):
+    if len(manutencoes) > LOTE_MAXIMO:
+        raise HTTPException(status_code=413, detail=f"Máximo de {LOTE_MAXIMO} manutenções por lote")
+    try:
+        modelos = manutencoes_adapter.validate_python(manutencoes)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=jsonable_encoder(e.errors(include_url=False)))
+    try:
+        documentos = [novo_documento(modelo, current_user["username"]) for modelo in modelos]
+        if documentos:
+            await db.manutencoes.insert_many(documentos)
+            await registrar_rollups_manutencoes(documentos)
+        for documento in documentos:
+            agendar_notificacao(documento)
+            del documento["_id"]
+        return {"message": "Manutenções criadas com sucesso", "manutencoes": documentos, "total": len(documentos)}
+    except Exception as e:
+        logger.error("Erro ao criar lote de manutenções: %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+@app.delete("/api/manutencoes/{manutencao_id}", tags=["Manutenções"])
+async def remover_manutencao(manutencao_id: str, current_user = Depends(get_current_active_user)):
+    if rollups_backfill["ativo"]:
+        # Não há como saber se a varredura já contou o documento removido
+        raise HTTPException(status_code=503, detail="Recálculo de indicadores em andamento, tente novamente")
+    try:
+        # A manutenção pode estar na coleção ativa ou em um arquivo anual
+        manutencao = None
+        for colecao in await colecoes_manutencoes(datetime.min):
+            manutencao = await colecao.find_one_and_delete({"id": manutencao_id})
+            if manutencao is not None:
+                break
+        if manutencao is None:
+            raise HTTPException(status_code=404, detail="Manutenção não encontrada")
+        if colecao.name.startswith(ARQUIVO_PREFIXO):
+            await db.manutencoes_arquivo_totais.update_one(
+                {"_id": int(colecao.name[len(ARQUIVO_PREFIXO):])}, {"$inc": {"total": -1}}
+            )
+        await registrar_rollup_manutencao(manutencao, sinal=-1)
+        await registrar_tombstone("manutencoes", manutencao_id, current_user["username"])
+        await cancelar_notificacao(manutencao_id)
+        return {"message": "Manutenção removida com sucesso"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Erro ao remover manutenção: %s", e)
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
 # Endpoints para relatórios
+async def gerar_relatorio_basico() -> dict:
+    # Contagens independentes executadas em paralelo
+    (
+        total_equipamentos,
+        total_manutencoes,
+        manutencoes_pendentes,
+        manutencoes_concluidas,
+        arquivadas,
+    ) = await asyncio.gather(
+        db.equipamentos.count_documents({}),
+        db.manutencoes.count_documents({}),
+        db.manutencoes.count_documents({"status": "pendente"}),
+        db.manutencoes.count_documents({"status": "concluida"}),
+        total_manutencoes_arquivadas(),
+    )
+
+    # Manutenções arquivadas são sempre concluídas; somar os totais pré-calculados
+    return {
+        "equipamentos": {
+            "total": total_equipamentos
+        },
+        "manutencoes": {
+            "total": total_manutencoes + arquivadas,
+            "pendentes": manutencoes_pendentes,
+            "concluidas": manutencoes_concluidas + arquivadas
+        },
+        "gerado_em": datetime.utcnow().isoformat(),
+    }
+
 @app.get("/api/relatorios", tags=["Relatórios"])
 async def listar_relatorios(current_user = Depends(get_current_active_user)):
     try:
         # Gerar relatório básico com estatísticas
-        total_equipamentos = await db.equipamentos.count_documents({})
-        total_manutencoes = await db.manutencoes.count_documents({})
-        
-        manutencoes_pendentes = await db.manutencoes.count_documents({"status": "pendente"})
-        manutencoes_concluidas = await db.manutencoes.count_documents({"status": "concluida"})
-        
+        relatorio = await gerar_relatorio_basico()
+        relatorio["gerado_por"] = current_user["username"]
+        return {"relatorio": relatorio}
+    except Exception as e:
+        logger.error("Erro ao gerar relatório: %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+# Arquivamento (hot/cold) de manutenções concluídas
+ARQUIVAMENTO_DIAS = int(os.getenv("ARQUIVAMENTO_DIAS", "365"))
+ARQUIVAMENTO_INTERVALO_HORAS = float(os.getenv("ARQUIVAMENTO_INTERVALO_HORAS", "24"))
+ARQUIVAMENTO_LOTE = 500
+ARQUIVO_PREFIXO = "manutencoes_arquivo_"
+
+arquivamento_task: Optional[asyncio.Task] = None
+
+def corte_arquivamento() -> datetime:
+    return datetime.utcnow() - timedelta(days=ARQUIVAMENTO_DIAS)
+
+async def anos_arquivados() -> list:
+    nomes = await db.list_collection_names(filter={"name": {"$regex": f"^{ARQUIVO_PREFIXO}"}})
+    return sorted(int(nome[len(ARQUIVO_PREFIXO):]) for nome in nomes if nome[len(ARQUIVO_PREFIXO):].isdigit())
+
+def anos_arquivo_no_intervalo(
+    anos: list, desde: Optional[datetime], ate: Optional[datetime], corte: datetime
+) -> list:
+    """Anos de arquivo que podem conter manutenções criadas em [desde, ate].
+
+    O arquivo só entra quando o início do intervalo é anterior ao corte, pois
+    nenhum registro criado depois do corte pode ter sido arquivado.
+    """
+    desde = para_utc(desde) if desde else None
+    ate = para_utc(ate) if ate else None
+    if desde is None or desde >= corte:
+        return []
+    ano_final = (ate or datetime.utcnow()).year
+    return [ano for ano in anos if desde.year <= ano <= ano_final]
+
+async def colecoes_manutencoes(desde: Optional[datetime] = None, ate: Optional[datetime] = None) -> list:
+    """Coleções a consultar para manutenções criadas no intervalo [desde, ate]."""
+    colecoes = [db.manutencoes]
+    if desde is None:
+        return colecoes
+    anos = anos_arquivo_no_intervalo(await anos_arquivados(), desde, ate, corte_arquivamento())
+    colecoes.extend(db[f"{ARQUIVO_PREFIXO}{ano}"] for ano in anos)
+    return colecoes
+
+async def total_manutencoes_arquivadas() -> int:
+    resultado = await db.manutencoes_arquivo_totais.aggregate([
+        {"$group": {"_id": None, "total": {"$sum": "$total"}}},
+    ]).to_list(1)
+    return resultado[0]["total"] if resultado else 0
+
+async def arquivar_manutencoes_concluidas() -> int:
+    corte = corte_arquivamento()
+    arquivadas = 0
+    anos = set()
+    while True:
+        lote = await db.manutencoes.find(
+            {"status": "concluida", "$or": [
+                # A data de conclusão manda; sem ela vale created_at. updated_at não
+                # entra: edições posteriores (ex.: migração) reiniciariam o prazo
+                {"data_conclusao": {"$lt": corte}},
+                {"data_conclusao": None, "created_at": {"$lt": corte}},
+            ]}
+        ).limit(ARQUIVAMENTO_LOTE).to_list(ARQUIVAMENTO_LOTE)
+        if not lote:
+            break
+
+        por_ano = {}
+        for manutencao in lote:
+            criada_em = parse_data(manutencao.get("created_at")) or manutencao["updated_at"]
+            por_ano.setdefault(criada_em.year, []).append(manutencao)
+
+        # Upsert por id torna a cópia idempotente se o processo cair no meio
+        for ano, manutencoes in por_ano.items():
+            await db[f"{ARQUIVO_PREFIXO}{ano}"].bulk_write(
+                [ReplaceOne({"id": m["id"]}, m, upsert=True) for m in manutencoes],
+                ordered=False,
+            )
+            anos.add(ano)
+        resultado = await db.manutencoes.delete_many({"_id": {"$in": [m["_id"] for m in lote]}})
+        arquivadas += resultado.deleted_count
+
+    # Totais recalculados a partir do arquivo para não depender de contadores parciais
+    for ano in anos:
+        colecao = db[f"{ARQUIVO_PREFIXO}{ano}"]
+        await colecao.create_index("id", unique=True)
+        await colecao.create_index("created_at")
+        await db.manutencoes_arquivo_totais.update_one(
+            {"_id": ano},
+            {"$set": {"total": await colecao.count_documents({}), "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+    return arquivadas
+
+async def ciclo_arquivamento():
+    while True:
+        # Mover documentos durante a reconstrução dos rollups causaria contagem dupla
+        while rollups_backfill["ativo"]:
+            await asyncio.sleep(5)
+        try:
+            arquivadas = await arquivar_manutencoes_concluidas()
+            if arquivadas:
+                logger.info("%d manutenções concluídas arquivadas", arquivadas)
+        except Exception as e:
+            logger.error("Erro no arquivamento de manutenções: %s", e)
+        await asyncio.sleep(ARQUIVAMENTO_INTERVALO_HORAS * 3600)
+
+async def preparar_arquivamento():
+    await db.manutencoes.create_index([("status", 1), ("data_conclusao", 1), ("created_at", 1)])
+
+@app.on_event("startup")
+async def iniciar_arquivamento():
+    global arquivamento_task
+    executar_em_segundo_plano("índices de arquivamento", preparar_arquivamento)
+    if ARQUIVAMENTO_DIAS > 0:
+        arquivamento_task = asyncio.create_task(ciclo_arquivamento())
+
+@app.on_event("shutdown")
+async def parar_arquivamento():
+    if arquivamento_task:
+        arquivamento_task.cancel()
+
+# Fila de jobs para relatórios pesados
+RELATORIO_JOB_WORKERS = int(os.getenv("RELATORIO_JOB_WORKERS", "2"))
+RELATORIO_JOB_TTL_HORAS = int(os.getenv("RELATORIO_JOB_TTL_HORAS", "24"))
+
+class RelatorioJobRequest(BaseModel):
+    tipo: str
+    parametros: Dict[str, Any] = {}
+
+class RelatorioJobCancelado(Exception):
+    pass
+
+relatorio_job_queue: "asyncio.Queue[str]" = asyncio.Queue()
+relatorio_job_workers: list = []
+
+async def atualizar_progresso_job(job_id: str, progresso: float):
+    # O worker consulta o status a cada etapa para respeitar cancelamentos
+    job = await db.relatorio_jobs.find_one_and_update(
+        {"id": job_id},
+        {"$set": {"progresso": round(progresso, 2), "updated_at": datetime.utcnow()}},
+        projection={"status": 1},
+    )
+    if job is None or job.get("status") == "cancelado":
+        raise RelatorioJobCancelado()
+
+async def relatorio_conformidade_anual(job_id: str, parametros: dict):
+    ano = int(parametros.get("ano", datetime.utcnow().year))
+    inicio = datetime(ano, 1, 1)
+    fim = datetime(ano + 1, 1, 1)
+
+    # Mapear equipamento -> departamento (setor)
+    setores = {}
+    async for equipamento in db.equipamentos.find({}, {"id": 1, "departamento": 1}):
+        setores[equipamento.get("id")] = equipamento.get("departamento") or "Sem setor"
+    await atualizar_progresso_job(job_id, 0.2)
+
+    por_setor = {}
+    processadas = 0
+    # O arquivo é particionado por created_at, sem relação fixa com data_prevista:
+    # todos os anos arquivados precisam ser consultados
+    colecoes = await colecoes_manutencoes(datetime.min)
+    filtro = {"data_prevista": {"$gte": inicio, "$lt": fim}}
+    total = 0
+    for colecao in colecoes:
+        total += await colecao.count_documents(filtro)
+
+    async def manutencoes_do_ano():
+        for colecao in colecoes:
+            async for manutencao in colecao.find(
+                filtro, {"equipamento_id": 1, "status": 1, "data_prevista": 1, "data_conclusao": 1}
+            ):
+                yield manutencao
+
+    async for manutencao in manutencoes_do_ano():
+        setor = setores.get(manutencao.get("equipamento_id"), "Sem setor")
+        item = por_setor.setdefault(setor, {"previstas": 0, "concluidas": 0, "no_prazo": 0})
+        item["previstas"] += 1
+        if manutencao.get("status") == "concluida":
+            item["concluidas"] += 1
+            conclusao = manutencao.get("data_conclusao")
+            if not isinstance(conclusao, datetime) or conclusao <= manutencao["data_prevista"]:
+                item["no_prazo"] += 1
+        processadas += 1
+        if processadas % 500 == 0 and total:
+            await atualizar_progresso_job(job_id, 0.2 + 0.8 * processadas / total)
+
+    for item in por_setor.values():
+        item["conformidade"] = round(item["no_prazo"] / item["previstas"], 4) if item["previstas"] else None
+    return {"ano": ano, "setores": por_setor}
+
+async def relatorio_custos(job_id: str, parametros: dict):
+    filtro = {}
+    if parametros.get("ano"):
+        ano = int(parametros["ano"])
+        filtro["data_prevista"] = {"$gte": datetime(ano, 1, 1), "$lt": datetime(ano + 1, 1, 1)}
+
+    setores = {}
+    async for equipamento in db.equipamentos.find({}, {"id": 1, "departamento": 1}):
+        setores[equipamento.get("id")] = equipamento.get("departamento") or "Sem setor"
+    await atualizar_progresso_job(job_id, 0.3)
+
+    # Agregação no MongoDB por equipamento; o agrupamento por setor é feito aqui
+    pipeline = [
+        {"$match": filtro},
+        {"$group": {
+            "_id": "$equipamento_id",
+            "custo_total": {"$sum": {"$ifNull": ["$custo", 0]}},
+            "quantidade": {"$sum": 1},
+        }},
+    ]
+    # Filtro por data_prevista: todos os anos arquivados podem conter registros do período
+    colecoes = await colecoes_manutencoes(datetime.min)
+    por_setor = {}
+    for colecao in colecoes:
+        async for linha in colecao.aggregate(pipeline):
+            setor = setores.get(linha["_id"], "Sem setor")
+            item = por_setor.setdefault(setor, {"custo_total": 0, "quantidade": 0})
+            item["custo_total"] += linha["custo_total"]
+            item["quantidade"] += linha["quantidade"]
+    return {"ano": parametros.get("ano"), "setores": por_setor}
+
+RELATORIOS_PESADOS = {
+    "conformidade_anual": relatorio_conformidade_anual,
+    "custos": relatorio_custos,
+}
+
+def chave_relatorio_job(tipo: str, parametros: dict) -> str:
+    conteudo = json.dumps({"tipo": tipo, "parametros": parametros}, sort_keys=True, default=str)
+    return hashlib.sha256(conteudo.encode()).hexdigest()
+
+async def executar_relatorio_job(job_id: str):
+    job = await db.relatorio_jobs.find_one_and_update(
+        {"id": job_id, "status": "pendente"},
+        {"$set": {"status": "executando", "iniciado_em": datetime.utcnow(), "updated_at": datetime.utcnow()}},
+    )
+    if job is None:
+        # Cancelado enquanto aguardava na fila
+        return
+    try:
+        resultado = await RELATORIOS_PESADOS[job["tipo"]](job_id, job.get("parametros", {}))
+        await db.relatorio_jobs.update_one(
+            {"id": job_id, "status": "executando"},
+            {"$unset": {"chave_ativa": ""}, "$set": {
+                "status": "concluido",
+                "progresso": 1.0,
+                "resultado": resultado,
+                "concluido_em": datetime.utcnow(),
+                "expira_em": datetime.utcnow() + timedelta(hours=RELATORIO_JOB_TTL_HORAS),
+                "updated_at": datetime.utcnow(),
+            }},
+        )
+    except RelatorioJobCancelado:
+        logger.info("Job de relatório %s cancelado", job_id)
+    except Exception as e:
+        logger.error("Erro ao executar job de relatório %s: %s", job_id, e)
+        await db.relatorio_jobs.update_one(
+            {"id": job_id, "status": "executando"},
+            {"$unset": {"chave_ativa": ""}, "$set": {
+                "status": "erro",
+                "erro": str(e),
+                "expira_em": datetime.utcnow() + timedelta(hours=RELATORIO_JOB_TTL_HORAS),
+                "updated_at": datetime.utcnow(),
+            }},
+        )
+
+async def relatorio_job_worker():
+    while True:
+        job_id = await relatorio_job_queue.get()
+        try:
+            await executar_relatorio_job(job_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Uma falha (ex.: MongoDB indisponível) não pode derrubar o worker
+            logger.error("Erro no worker de relatórios (job %s): %s", job_id, e)
+        finally:
+            relatorio_job_queue.task_done()
+
+async def preparar_relatorio_jobs():
+    # TTL index: o MongoDB remove resultados expirados automaticamente
+    await db.relatorio_jobs.create_index("expira_em", expireAfterSeconds=0)
+    await db.relatorio_jobs.create_index("id", unique=True)
+    # chave_ativa só existe enquanto o job está pendente/em execução: o índice
+    # único parcial impede dois jobs idênticos ativos ao mesmo tempo
+    await db.relatorio_jobs.create_index(
+        "chave_ativa", unique=True, partialFilterExpression={"chave_ativa": {"$exists": True}}
+    )
+
+    # Jobs interrompidos por um restart voltam para a fila
+    await db.relatorio_jobs.update_many({"status": "executando"}, {"$set": {"status": "pendente"}})
+    async for job in db.relatorio_jobs.find({"status": "pendente"}, {"id": 1}).sort("created_at", 1):
+        relatorio_job_queue.put_nowait(job["id"])
+
+@app.on_event("startup")
+async def iniciar_relatorio_jobs():
+    executar_em_segundo_plano("jobs de relatório", preparar_relatorio_jobs)
+    for _ in range(RELATORIO_JOB_WORKERS):
+        relatorio_job_workers.append(asyncio.create_task(relatorio_job_worker()))
+
+@app.on_event("shutdown")
+async def parar_relatorio_jobs():
+    for worker in relatorio_job_workers:
+        worker.cancel()
+    relatorio_job_workers.clear()
+
+def serializar_relatorio_job(job: dict) -> dict:
+    if "_id" in job:
+        del job["_id"]
+    job.pop("chave", None)
+    job.pop("chave_ativa", None)
+    return job
+
+@app.post("/api/relatorios/jobs", tags=["Relatórios"], status_code=202)
+async def criar_relatorio_job(pedido: RelatorioJobRequest, current_user = Depends(get_current_active_user)):
+    if pedido.tipo not in RELATORIOS_PESADOS:
+        raise HTTPException(status_code=400, detail=f"Tipo de relatório inválido: {pedido.tipo}")
+    try:
+        chave = chave_relatorio_job(pedido.tipo, pedido.parametros)
+        job = {
+            "id": str(uuid.uuid4()),
+            "tipo": pedido.tipo,
+            "parametros": pedido.parametros,
+            "chave": chave,
+            "chave_ativa": chave,
+            "status": "pendente",
+            "progresso": 0.0,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+            "created_by": current_user["username"],
+        }
+        try:
+            await db.relatorio_jobs.insert_one(job)
+        except DuplicateKeyError:
+            # Deduplicação: reaproveitar job idêntico ainda pendente ou em execução
+            existente = await db.relatorio_jobs.find_one({"chave_ativa": chave})
+            if existente:
+                return {"message": "Job de relatório já em andamento", "job": serializar_relatorio_job(existente)}
+            raise
+        relatorio_job_queue.put_nowait(job["id"])
+        return {"message": "Job de relatório criado com sucesso", "job": serializar_relatorio_job(job)}
+    except Exception as e:
+        logger.error("Erro ao criar job de relatório: %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+@app.get("/api/relatorios/jobs/{job_id}", tags=["Relatórios"])
+async def obter_relatorio_job(job_id: str, current_user = Depends(get_current_active_user)):
+    job = await db.relatorio_jobs.find_one({"id": job_id})
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job de relatório não encontrado")
+    return {"job": serializar_relatorio_job(job)}
+
+@app.delete("/api/relatorios/jobs/{job_id}", tags=["Relatórios"])
+async def cancelar_relatorio_job(job_id: str, current_user = Depends(get_current_active_user)):
+    job = await db.relatorio_jobs.find_one_and_update(
+        {"id": job_id, "status": {"$in": ["pendente", "executando"]}},
+        {"$unset": {"chave_ativa": ""}, "$set": {
+            "status": "cancelado",
+            "expira_em": datetime.utcnow() + timedelta(hours=RELATORIO_JOB_TTL_HORAS),
+            "updated_at": datetime.utcnow(),
+        }},
+    )
+    if job is None:
+        if await db.relatorio_jobs.find_one({"id": job_id}, {"_id": 1}) is None:
+            raise HTTPException(status_code=404, detail="Job de relatório não encontrado")
+        raise HTTPException(status_code=409, detail="Job de relatório já finalizado")
+    return {"message": "Job de relatório cancelado com sucesso"}
+
+# Rollups diários de confiabilidade (MTBF/MTTR/pontualidade)
+def dia_rollup(data: datetime) -> datetime:
+    return datetime(data.year, data.month, data.day)
+
+def incrementos_rollup_manutencao(manutencao: dict) -> Dict[datetime, Dict[str, float]]:
+    """Calcula os contadores que uma manutenção soma nos rollups diários."""
+    incrementos = {}
+    criada_em = parse_data(manutencao.get("data_abertura")) or parse_data(manutencao.get("created_at"))
+    if criada_em and manutencao.get("tipo") == "corretiva":
+        incrementos.setdefault(dia_rollup(criada_em), {})["falhas"] = 1
+
+    if manutencao.get("status") == "concluida":
+        concluida_em = parse_data(manutencao.get("data_conclusao")) or criada_em
+        if concluida_em:
+            dia = incrementos.setdefault(dia_rollup(concluida_em), {})
+            dia["concluidas"] = dia.get("concluidas", 0) + 1
+            prevista = parse_data(manutencao.get("data_prevista"))
+            if prevista is None or concluida_em <= prevista:
+                dia["no_prazo"] = dia.get("no_prazo", 0) + 1
+            if manutencao.get("tipo") == "corretiva" and criada_em and concluida_em >= criada_em:
+                dia["reparos"] = dia.get("reparos", 0) + 1
+                dia["horas_reparo"] = dia.get("horas_reparo", 0) + (concluida_em - criada_em).total_seconds() / 3600
+    return incrementos
+
+# Enquanto a reconstrução roda, o caminho de escrita só enfileira os documentos;
+# eles são aplicados depois da troca de coleções para não se perderem.
+rollups_backfill: Dict[str, Any] = {"ativo": False, "pendentes": []}
+ROLLUPS_MARCADOR = "rollups_confiabilidade"
+
+def somar_incrementos(destino: dict, incrementos: dict):
+    for campo, valor in incrementos.items():
+        destino[campo] = destino.get(campo, 0) + valor
+
+def agrupar_incrementos(manutencoes: list, sinal: int = 1) -> Dict[tuple, dict]:
+    """Soma as contribuições de várias manutenções por (equipamento, dia)."""
+    linhas: Dict[tuple, dict] = {}
+    for manutencao in manutencoes:
+        equipamento_id = manutencao.get("equipamento_id")
+        if not equipamento_id:
+            continue
+        for dia, contadores in incrementos_rollup_manutencao(manutencao).items():
+            somar_incrementos(
+                linhas.setdefault((equipamento_id, dia), {}),
+                {campo: valor * sinal for campo, valor in contadores.items()},
+            )
+    return linhas
+
+async def registrar_rollups_manutencoes(manutencoes: list, sinal: int = 1):
+    """Soma (sinal=1) ou desfaz (sinal=-1) a contribuição das manutenções.
+
+    Um lote custa uma consulta de tipos de equipamento e um bulk_write.
+    """
+    if rollups_backfill["ativo"]:
+        rollups_backfill["pendentes"].extend(manutencoes)
+        return
+    linhas = agrupar_incrementos(manutencoes, sinal)
+    if not linhas:
+        return
+    tipos = {}
+    async for equipamento in db.equipamentos.find(
+        {"id": {"$in": list({equipamento_id for equipamento_id, _ in linhas})}}, {"id": 1, "tipo": 1}
+    ):
+        tipos[equipamento["id"]] = equipamento.get("tipo") or "Sem tipo"
+    await db.confiabilidade_diaria.bulk_write([
+        UpdateOne(
+            {"equipamento_id": equipamento_id, "dia": dia},
+            {"$inc": contadores, "$set": {"tipo_equipamento": tipos.get(equipamento_id, "Sem tipo")}},
+            upsert=True,
+        )
+        for (equipamento_id, dia), contadores in linhas.items()
+    ], ordered=False)
+
+async def registrar_rollup_manutencao(manutencao: dict, sinal: int = 1):
+    await registrar_rollups_manutencoes([manutencao], sinal)
+
+async def reconstruir_rollups_confiabilidade():
+    """Recalcula os rollups a partir do histórico em uma coleção temporária.
+
+    A coleção definitiva só é substituída (rename) ao final, então uma queda no
+    meio deixa os rollups antigos intactos e o marcador ausente: a próxima
+    inicialização simplesmente recomeça.
+    """
+    rollups_backfill["ativo"] = True
+    rollups_backfill["pendentes"] = []
+    inicio = datetime.utcnow() - timedelta(minutes=5)
+    try:
+        tipos = {}
+        async for equipamento in db.equipamentos.find({}, {"id": 1, "tipo": 1}):
+            tipos[equipamento.get("id")] = equipamento.get("tipo") or "Sem tipo"
+
+        linhas: Dict[tuple, dict] = {}
+        recentes = set()
+
+        def acumular(manutencao: dict):
+            for chave, contadores in agrupar_incrementos([manutencao]).items():
+                somar_incrementos(linhas.setdefault(chave, {}), contadores)
+
+        for colecao in await colecoes_manutencoes(datetime.min):
+            async for manutencao in colecao.find({}):
+                acumular(manutencao)
+                criada_em = parse_data(manutencao.get("created_at"))
+                if criada_em and criada_em >= inicio:
+                    recentes.add(manutencao.get("id"))
+
+        # Documentos gravados durante a varredura que ela não chegou a ver
+        pendentes, rollups_backfill["pendentes"] = rollups_backfill["pendentes"], []
+        for manutencao in pendentes:
+            if manutencao.get("id") not in recentes:
+                acumular(manutencao)
+
+        temporaria = db.confiabilidade_diaria_reconstrucao
+        await temporaria.drop()
+        documentos = [
+            {"equipamento_id": equipamento_id, "dia": dia,
+             "tipo_equipamento": tipos.get(equipamento_id, "Sem tipo"), **contadores}
+            for (equipamento_id, dia), contadores in linhas.items()
+        ]
+        for i in range(0, len(documentos), 1000):
+            await temporaria.insert_many(documentos[i:i + 1000])
+        await temporaria.create_index([("equipamento_id", 1), ("dia", 1)], unique=True)
+        await temporaria.create_index([("dia", 1), ("tipo_equipamento", 1)])
+        if documentos:
+            await temporaria.rename("confiabilidade_diaria", dropTarget=True)
+        else:
+            await db.confiabilidade_diaria.delete_many({})
+        await db.marcadores.update_one(
+            {"_id": ROLLUPS_MARCADOR},
+            {"$set": {"concluido_em": datetime.utcnow(), "linhas": len(documentos)}},
+            upsert=True,
+        )
+    finally:
+        rollups_backfill["ativo"] = False
+        pendentes, rollups_backfill["pendentes"] = rollups_backfill["pendentes"], []
+        await registrar_rollups_manutencoes(pendentes)
+
+async def preparar_rollups_confiabilidade():
+    await db.confiabilidade_diaria.create_index([("equipamento_id", 1), ("dia", 1)], unique=True)
+    await db.confiabilidade_diaria.create_index([("dia", 1), ("tipo_equipamento", 1)])
+    # Backfill único: depois disso os rollups são mantidos pelos caminhos de escrita
+    if await db.marcadores.find_one({"_id": ROLLUPS_MARCADOR}) is None:
+        logger.info("Reconstruindo rollups de confiabilidade")
+        await reconstruir_rollups_confiabilidade()
+        logger.info("Rollups de confiabilidade reconstruídos")
+
+@app.on_event("startup")
+async def iniciar_rollups_confiabilidade():
+    # Em segundo plano: um histórico grande não pode atrasar a inicialização
+    executar_em_segundo_plano("rollups de confiabilidade", preparar_rollups_confiabilidade)
+
+def metricas_confiabilidade(linha: dict, horas_operacao: float) -> dict:
+    falhas = linha.get("falhas", 0)
+    reparos = linha.get("reparos", 0)
+    concluidas = linha.get("concluidas", 0)
+    return {
+        "falhas": falhas,
+        "reparos": reparos,
+        "concluidas": concluidas,
+        "mtbf_horas": round(horas_operacao / falhas, 2) if falhas else None,
+        "mttr_horas": round(linha.get("horas_reparo", 0) / reparos, 2) if reparos else None,
+        "taxa_no_prazo": round(linha.get("no_prazo", 0) / concluidas, 4) if concluidas else None,
+    }
+
+@app.get("/api/relatorios/confiabilidade", tags=["Relatórios"])
+async def relatorio_confiabilidade(
+    dias: int = 90,
+    inicio: Optional[datetime] = None,
+    fim: Optional[datetime] = None,
+    current_user = Depends(get_current_active_user),
+):
+    try:
+        fim = dia_rollup(fim or datetime.utcnow()) + timedelta(days=1)
+        inicio = dia_rollup(inicio) if inicio else fim - timedelta(days=dias)
+        if inicio >= fim:
+            raise HTTPException(status_code=400, detail="Intervalo de datas inválido")
+        horas_janela = (fim - inicio).total_seconds() / 3600
+
+        soma = {
+            "falhas": {"$sum": "$falhas"},
+            "reparos": {"$sum": "$reparos"},
+            "horas_reparo": {"$sum": "$horas_reparo"},
+            "concluidas": {"$sum": "$concluidas"},
+            "no_prazo": {"$sum": "$no_prazo"},
+        }
+        filtro = {"$match": {"dia": {"$gte": inicio, "$lt": fim}}}
+        por_equipamento_cursor = db.confiabilidade_diaria.aggregate([
+            filtro,
+            {"$group": {"_id": "$equipamento_id", "tipo_equipamento": {"$last": "$tipo_equipamento"}, **soma}},
+        ])
+        por_tipo_cursor = db.confiabilidade_diaria.aggregate([
+            filtro,
+            {"$group": {"_id": "$tipo_equipamento", **soma}},
+        ])
+        equipamentos_por_tipo_cursor = db.equipamentos.aggregate([
+            {"$group": {"_id": {"$ifNull": ["$tipo", "Sem tipo"]}, "quantidade": {"$sum": 1}}},
+        ])
+        por_equipamento, por_tipo, equipamentos_por_tipo = await asyncio.gather(
+            por_equipamento_cursor.to_list(None),
+            por_tipo_cursor.to_list(None),
+            equipamentos_por_tipo_cursor.to_list(None),
+        )
+        quantidade_por_tipo = {linha["_id"]: linha["quantidade"] for linha in equipamentos_por_tipo}
+
         return {
-            "relatorio": {
-                "equipamentos": {
-                    "total": total_equipamentos
-                },
-                "manutencoes": {
-                    "total": total_manutencoes,
-                    "pendentes": manutencoes_pendentes,
-                    "concluidas": manutencoes_concluidas
-                },
+            "confiabilidade": {
+                "inicio": inicio.isoformat(),
+                "fim": fim.isoformat(),
+                "equipamentos": [
+                    {"equipamento_id": linha["_id"], "tipo": linha.get("tipo_equipamento"),
+                     **metricas_confiabilidade(linha, horas_janela)}
+                    for linha in por_equipamento
+                ],
+                # MTBF por tipo considera o tempo de operação somado de todos os equipamentos do tipo
+                "tipos": [
+                    {"tipo": linha["_id"],
+                     **metricas_confiabilidade(linha, horas_janela * max(quantidade_por_tipo.get(linha["_id"], 1), 1))}
+                    for linha in por_tipo
+                ],
                 "gerado_em": datetime.utcnow().isoformat(),
-                "gerado_por": current_user["username"]
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Erro ao gerar relatório: {e}")
+        logger.error("Erro ao gerar relatório de confiabilidade: %s", e)
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
+# Sincronização incremental (delta sync) para clientes offline/mobile
+SYNC_COLECOES = ("equipamentos", "manutencoes")
+SYNC_LIMITE_MAXIMO = 1000
+SYNC_PROJECOES = {
+    "equipamentos": EQUIPAMENTO_PROJECAO,
+    "manutencoes": MANUTENCAO_PROJECAO,
+    "sync_tombstones": {"_id": 0},
+}
+
+async def registrar_tombstone(colecao: str, documento_id: str, removido_por: str):
+    await db.sync_tombstones.insert_one({
+        "id": documento_id,
+        "colecao": colecao,
+        "updated_at": datetime.utcnow(),
+        "removido_por": removido_por,
+    })
+
+def codificar_token_sync(updated_at: datetime, documento_id: str) -> str:
+    conteudo = json.dumps({"t": updated_at.isoformat(), "id": documento_id})
+    return base64.urlsafe_b64encode(conteudo.encode()).decode()
+
+def decodificar_token_sync(token: str):
+    try:
+        conteudo = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return datetime.fromisoformat(conteudo["t"]), str(conteudo["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Token de sincronização inválido")
+
+async def preparar_indices_sync():
+    # Índice (updated_at, id): o custo do sync acompanha o volume de mudanças
+    for colecao in SYNC_COLECOES + ("sync_tombstones",):
+        await db[colecao].create_index([("updated_at", 1), ("id", 1)])
+
+@app.on_event("startup")
+async def iniciar_indices_sync():
+    executar_em_segundo_plano("índices de sincronização", preparar_indices_sync)
+
+def intercalar_mudancas(fontes: tuple, resultados: list, limite: int):
+    """Intercala os resultados ordenados de cada coleção e corta no limite.
+
+    Retorna (resposta, token do último item ou None, tem_mais).
+    """
+    mudancas = sorted(
+        ((documento["updated_at"], documento["id"], colecao, documento)
+         for colecao, documentos in zip(fontes, resultados) for documento in documentos),
+        key=lambda item: (item[0], item[1]),
+    )
+    tem_mais = len(mudancas) > limite
+    mudancas = mudancas[:limite]
+
+    resposta = {colecao: [] for colecao in SYNC_COLECOES}
+    resposta["removidos"] = []
+    for _, _, colecao, documento in mudancas:
+        if colecao == "sync_tombstones":
+            resposta["removidos"].append({"colecao": documento["colecao"], "id": documento["id"]})
+        else:
+            resposta[colecao].append(documento)
+
+    proximo = codificar_token_sync(mudancas[-1][0], mudancas[-1][1]) if mudancas else None
+    return resposta, proximo, tem_mais
+
+@app.get("/api/sync", tags=["Sincronização"])
+async def sincronizar(
+    since: Optional[str] = None,
+    limite: int = 500,
+    current_user = Depends(get_current_active_user),
+):
+    limite = max(1, min(limite, SYNC_LIMITE_MAXIMO))
+    filtro = {}
+    if since:
+        desde, desde_id = decodificar_token_sync(since)
+        filtro = {"$or": [
+            {"updated_at": {"$gt": desde}},
+            {"updated_at": desde, "id": {"$gt": desde_id}},
+        ]}
+    try:
+        # Cada coleção já vem ordenada; basta intercalar e cortar no limite
+        fontes = SYNC_COLECOES + ("sync_tombstones",)
+        resultados = await asyncio.gather(*(
+            db[colecao].find(filtro, SYNC_PROJECOES[colecao]).sort([("updated_at", 1), ("id", 1)]).limit(limite + 1).to_list(limite + 1)
+            for colecao in fontes
+        ))
+        resposta, proximo, tem_mais = intercalar_mudancas(fontes, resultados, limite)
+        if proximo is None:
+            proximo = since
+        return {**resposta, "proximo": proximo, "tem_mais": tem_mais}
+    except Exception as e:
+        logger.error("Erro ao sincronizar: %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+# Agendador de notificações
+# Um min-heap de transições (próxima/vencida) ordenado pelo instante em que
+# ocorrem; o estado atual de cada manutenção aberta fica em db.notificacoes.
+NOTIFICACAO_JANELA_DIAS = float(os.getenv("NOTIFICACAO_JANELA_DIAS", "7"))
+
+NOTIFICACAO_ESTADOS = {
+    "proxima": {
+        "titulo": "Manutenção Próxima",
+        "mensagem": "A manutenção {id} está próxima do vencimento",
+        "prioridade": "media",
+        "ordem": 1,
+    },
+    "vencida": {
+        "titulo": "Manutenção Vencida",
+        "mensagem": "A manutenção {id} está vencida",
+        "prioridade": "alta",
+        "ordem": 0,
+    },
+}
+
+notificacao_heap: list = []
+notificacao_prazos: Dict[str, datetime] = {}
+notificacao_sequencia = itertools.count()
+notificacao_evento = asyncio.Event()
+notificacao_task: Optional[asyncio.Task] = None
+
+def agendar_notificacao(manutencao: dict):
+    manutencao_id = manutencao["id"]
+    prazo = parse_data(manutencao.get("data_prevista"))
+    if prazo is None or manutencao.get("status") == "concluida":
+        notificacao_prazos.pop(manutencao_id, None)
+        return
+    # Entradas antigas do heap ficam órfãs e são ignoradas quando o prazo muda
+    notificacao_prazos[manutencao_id] = prazo
+    inicio_janela = prazo - timedelta(days=NOTIFICACAO_JANELA_DIAS)
+    if datetime.utcnow() < prazo:
+        heapq.heappush(notificacao_heap, (inicio_janela, next(notificacao_sequencia), manutencao_id, "proxima", prazo))
+    heapq.heappush(notificacao_heap, (prazo, next(notificacao_sequencia), manutencao_id, "vencida", prazo))
+    notificacao_evento.set()
+
+async def cancelar_notificacao(manutencao_id: str):
+    notificacao_prazos.pop(manutencao_id, None)
+    await db.notificacoes.delete_one({"manutencao_id": manutencao_id})
+
+async def persistir_notificacao(manutencao_id: str, estado: str, prazo: datetime):
+    modelo = NOTIFICACAO_ESTADOS[estado]
+    await db.notificacoes.update_one(
+        {"manutencao_id": manutencao_id},
+        {
+            "$set": {
+                "tipo": estado,
+                "titulo": modelo["titulo"],
+                "mensagem": modelo["mensagem"].format(id=manutencao_id),
+                "data": prazo,
+                "prioridade": modelo["prioridade"],
+                "ordem": modelo["ordem"],
+                "updated_at": datetime.utcnow(),
+            },
+            "$setOnInsert": {"id": str(uuid.uuid4()), "created_at": datetime.utcnow()},
+        },
+        upsert=True,
+    )
+
+def transicoes_devidas(agora: datetime) -> list:
+    """Retira do heap as transições até ``agora``, ignorando entradas órfãs."""
+    transicoes = []
+    while notificacao_heap and notificacao_heap[0][0] <= agora:
+        _, _, manutencao_id, estado, prazo = heapq.heappop(notificacao_heap)
+        if notificacao_prazos.get(manutencao_id) == prazo:
+            transicoes.append((manutencao_id, estado, prazo))
+    return transicoes
+
+async def ciclo_notificacoes():
+    while True:
+        notificacao_evento.clear()
+        agora = datetime.utcnow()
+        for manutencao_id, estado, prazo in transicoes_devidas(agora):
+            try:
+                await persistir_notificacao(manutencao_id, estado, prazo)
+            except Exception as e:
+                logger.error("Erro ao registrar notificação %s: %s", manutencao_id, e)
+        espera = (notificacao_heap[0][0] - agora).total_seconds() if notificacao_heap else 3600
+        try:
+            # Acorda no instante da próxima transição ou quando o heap muda
+            await asyncio.wait_for(notificacao_evento.wait(), timeout=max(espera, 0))
+        except asyncio.TimeoutError:
+            pass
+
+async def carregar_notificacoes():
+    await db.notificacoes.create_index("manutencao_id", unique=True)
+    await db.notificacoes.create_index([("ordem", 1), ("data", 1)])
+
+    # Sem limpar o heap: manutenções criadas durante a carga já estão nele
+    async for manutencao in db.manutencoes.find(
+        {"status": {"$ne": "concluida"}, "data_prevista": {"$ne": None}},
+        {"_id": 0, "id": 1, "status": 1, "data_prevista": 1},
+    ):
+        agendar_notificacao(manutencao)
+    # Remover notificações de manutenções que não estão mais abertas
+    await db.notificacoes.delete_many({"manutencao_id": {"$nin": list(notificacao_prazos)}})
+
+@app.on_event("startup")
+async def iniciar_notificacoes():
+    global notificacao_task
+    executar_em_segundo_plano("notificações", carregar_notificacoes)
+    notificacao_task = asyncio.create_task(ciclo_notificacoes())
+
+@app.on_event("shutdown")
+async def parar_notificacoes():
+    if notificacao_task:
+        notificacao_task.cancel()
+
 # Endpoint para notificações
+async def gerar_notificacoes(limite: int = 100) -> list:
+    # Leitura indexada do estado mantido pelo agendador; vencidas primeiro
+    return await db.notificacoes.find(
+        {}, {"_id": 0, "id": 1, "tipo": 1, "titulo": 1, "mensagem": 1, "data": 1, "prioridade": 1}
+    ).sort([("ordem", 1), ("data", 1)]).limit(limite).to_list(limite)
+
 @app.get("/api/notificacoes", tags=["Notificações"])
 async def listar_notificacoes(current_user = Depends(get_current_active_user)):
     try:
-        # Buscar manutenções vencidas ou próximas do vencimento
-        hoje = datetime.utcnow()
-        proxima_semana = hoje + timedelta(days=7)
-        
-        manutencoes_vencidas = await db.manutencoes.find({
-            "data_prevista": {"$lt": hoje},
-            "status": {"$ne": "concluida"}
-        }).to_list(100)
-        
-        manutencoes_proximas = await db.manutencoes.find({
-            "data_prevista": {"$gte": hoje, "$lte": proxima_semana},
-            "status": {"$ne": "concluida"}
-        }).to_list(100)
-        
-        notificacoes = []
-        
-        for manutencao in manutencoes_vencidas:
-            if "_id" in manutencao:
-                del manutencao["_id"]
-            notificacoes.append({
-                "id": str(uuid.uuid4()),
-                "tipo": "vencida",
-                "titulo": "Manutenção Vencida",
-                "mensagem": f"A manutenção {manutencao.get('id', 'N/A')} está vencida",
-                "data": manutencao.get("data_prevista", hoje),
-                "prioridade": "alta"
-            })
-        
-        for manutencao in manutencoes_proximas:
-            if "_id" in manutencao:
-                del manutencao["_id"]
-            notificacoes.append({
-                "id": str(uuid.uuid4()),
-                "tipo": "proxima",
-                "titulo": "Manutenção Próxima",
-                "mensagem": f"A manutenção {manutencao.get('id', 'N/A')} está próxima do vencimento",
-                "data": manutencao.get("data_prevista", hoje),
-                "prioridade": "media"
-            })
-        
+        notificacoes = await gerar_notificacoes()
         return {"notificacoes": notificacoes, "total": len(notificacoes)}
     except Exception as e:
-        logger.error(f"Erro ao listar notificações: {e}")
+        logger.error("Erro ao listar notificações: %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+# Dashboard agregado (uma única chamada para o frontend)
+DASHBOARD_CACHE_SEGUNDOS = float(os.getenv("DASHBOARD_CACHE_SEGUNDOS", "15"))
+DASHBOARD_TOP_N = 5
+
+dashboard_cache: Dict[str, Any] = {"expira_em": 0.0, "corpo": None, "etag": None, "timing": ""}
+dashboard_lock = asyncio.Lock()
+
+async def cronometrar(nome: str, coro):
+    inicio = time.perf_counter()
+    resultado = await coro
+    return nome, resultado, (time.perf_counter() - inicio) * 1000
+
+async def recentes(colecao, projecao: dict, limite: int) -> list:
+    return await colecao.find({}, projecao).sort("created_at", -1).limit(limite).to_list(limite)
+
+async def montar_dashboard():
+    secoes = await asyncio.gather(
+        cronometrar("relatorio", gerar_relatorio_basico()),
+        cronometrar("notificacoes", gerar_notificacoes(DASHBOARD_TOP_N)),
+        cronometrar("equipamentos", recentes(db.equipamentos, EQUIPAMENTO_PROJECAO, DASHBOARD_TOP_N)),
+        cronometrar("manutencoes", recentes(db.manutencoes, MANUTENCAO_PROJECAO, DASHBOARD_TOP_N)),
+    )
+    payload = {nome: resultado for nome, resultado, _ in secoes}
+    corpo = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode()
+    dashboard_cache.update({
+        "expira_em": time.monotonic() + DASHBOARD_CACHE_SEGUNDOS,
+        "corpo": corpo,
+        "etag": '"' + hashlib.sha256(corpo).hexdigest()[:32] + '"',
+        "timing": ", ".join(f"{nome};dur={duracao:.1f}" for nome, _, duracao in secoes),
+    })
+
+@app.get("/api/dashboard", tags=["Relatórios"])
+async def obter_dashboard(request: Request, current_user = Depends(get_current_active_user)):
+    try:
+        timing = 'cache;desc="hit"'
+        if dashboard_cache["corpo"] is None or time.monotonic() >= dashboard_cache["expira_em"]:
+            # Só uma requisição recalcula; as demais aguardam o resultado
+            async with dashboard_lock:
+                if dashboard_cache["corpo"] is None or time.monotonic() >= dashboard_cache["expira_em"]:
+                    await montar_dashboard()
+                    timing = dashboard_cache["timing"]
+        headers = {
+            "ETag": dashboard_cache["etag"],
+            "Cache-Control": f"private, max-age={int(DASHBOARD_CACHE_SEGUNDOS)}",
+            "Server-Timing": timing,
+        }
+        if request.headers.get("if-none-match") == dashboard_cache["etag"]:
+            return Response(status_code=304, headers=headers)
+        return Response(content=dashboard_cache["corpo"], media_type="application/json", headers=headers)
+    except Exception as e:
+        logger.error("Erro ao montar dashboard: %s", e)
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    # log_config=None: manter a configuração de logging feita na importação
+    uvicorn.run(app, host="0.0.0.0", port=8001, log_config=None)
@@ -10,12 +10,23 @@ uvicorn server:app --host 0.0.0.0 --port 8001 &
 BACKEND_PID=$!
 
 echo "Waiting for backend to start..."
-sleep 30
-
-if ! kill -0 $BACKEND_PID 2>/dev/null; then
-    echo "Backend failed to start at initialization, exiting"
-    exit 1
-fi
+# Poll the API instead of sleeping a fixed time; give up after STARTUP_TIMEOUT seconds
+STARTUP_TIMEOUT=${STARTUP_TIMEOUT:-30}
+ELAPSED=0
+until wget -q -O /dev/null http://127.0.0.1:8001/api/health/live; do
+    if ! kill -0 $BACKEND_PID 2>/dev/null; then
+        echo "Backend failed to start at initialization, exiting"
+        exit 1
+    fi
+    if [ "$ELAPSED" -ge "$((STARTUP_TIMEOUT * 5))" ]; then
+        echo "Backend did not become ready in ${STARTUP_TIMEOUT}s, exiting"
+        kill $BACKEND_PID
+        exit 1
+    fi
+    sleep 0.2
+    ELAPSED=$((ELAPSED + 1))
+done
+echo "Backend ready"
 
 # Start Nginx
 nginx -g 'daemon off;' &
@@ -16,7 +16,7 @@ const Dashboard = () => {
 
   const fetchStats = async () => {
     try {
-      const response = await axios.get(`${baseURL}/api/relatorios`);
+      const response = await axios.get(`${baseURL}/api/dashboard`);
       setStats(response.data.relatorio);
     } catch (error) {
       console.error('Erro ao buscar estatísticas:', error);
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# server.py vive em backend/ e é importado como módulo de primeiro nível
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
@@ -0,0 +1,28 @@
+from datetime import datetime, timezone
+
+from server import anos_arquivo_no_intervalo
+
+ANOS = [2019, 2020, 2021, 2023]
+CORTE = datetime(2024, 1, 1)
+
+
+def test_sem_inicio_nao_consulta_arquivo():
+    assert anos_arquivo_no_intervalo(ANOS, None, None, CORTE) == []
+
+
+def test_inicio_depois_do_corte_nao_consulta_arquivo():
+    assert anos_arquivo_no_intervalo(ANOS, datetime(2024, 6, 1), None, CORTE) == []
+
+
+def test_intervalo_seleciona_somente_anos_cobertos():
+    assert anos_arquivo_no_intervalo(ANOS, datetime(2020, 3, 1), datetime(2021, 12, 31), CORTE) == [2020, 2021]
+
+
+def test_sem_fim_vai_ate_o_ano_atual():
+    assert anos_arquivo_no_intervalo(ANOS, datetime(2021, 1, 1), None, CORTE) == [2021, 2023]
+
+
+def test_datas_com_fuso_nao_quebram_a_comparacao():
+    desde = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    ate = datetime(2021, 6, 1, tzinfo=timezone.utc)
+    assert anos_arquivo_no_intervalo(ANOS, desde, ate, CORTE) == [2020, 2021]
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from server import agrupar_incrementos, incrementos_rollup_manutencao
+
+
+def test_corretiva_aberta_conta_falha_no_dia_de_abertura():
+    incrementos = incrementos_rollup_manutencao({
+        "tipo": "corretiva",
+        "status": "pendente",
+        "created_at": datetime(2024, 3, 10, 15, 30),
+    })
+    assert incrementos == {datetime(2024, 3, 10): {"falhas": 1}}
+
+
+def test_preventiva_aberta_nao_gera_incrementos():
+    assert incrementos_rollup_manutencao({
+        "tipo": "preventiva",
+        "status": "pendente",
+        "created_at": datetime(2024, 3, 10),
+    }) == {}
+
+
+def test_corretiva_concluida_registra_reparo_no_dia_da_conclusao():
+    incrementos = incrementos_rollup_manutencao({
+        "tipo": "corretiva",
+        "status": "concluida",
+        "data_abertura": "2024-03-10T08:00:00",
+        "data_conclusao": "2024-03-11T14:00:00",
+        "data_prevista": "2024-03-12T00:00:00",
+    })
+    assert incrementos == {
+        datetime(2024, 3, 10): {"falhas": 1},
+        datetime(2024, 3, 11): {"concluidas": 1, "no_prazo": 1, "reparos": 1, "horas_reparo": 30.0},
+    }
+
+
+def test_conclusao_apos_prazo_nao_conta_no_prazo():
+    incrementos = incrementos_rollup_manutencao({
+        "tipo": "preventiva",
+        "status": "concluida",
+        "created_at": datetime(2024, 3, 1),
+        "data_prevista": datetime(2024, 3, 5),
+        "data_conclusao": datetime(2024, 3, 6),
+    })
+    assert incrementos == {datetime(2024, 3, 6): {"concluidas": 1}}
+
+
+def test_datas_com_fuso_sao_convertidas_para_utc():
+    incrementos = incrementos_rollup_manutencao({
+        "tipo": "corretiva",
+        "status": "pendente",
+        "data_abertura": "2024-03-10T22:00:00-03:00",
+    })
+    assert incrementos == {datetime(2024, 3, 11): {"falhas": 1}}
+
+
+def test_agrupar_incrementos_soma_por_equipamento_e_dia():
+    dia = datetime(2024, 3, 10)
+    manutencoes = [
+        {"equipamento_id": "e1", "tipo": "corretiva", "status": "pendente", "created_at": dia},
+        {"equipamento_id": "e1", "tipo": "corretiva", "status": "pendente", "created_at": dia},
+        {"equipamento_id": "e2", "tipo": "corretiva", "status": "pendente", "created_at": dia},
+        {"tipo": "corretiva", "status": "pendente", "created_at": dia},
+    ]
+    assert agrupar_incrementos(manutencoes) == {
+        ("e1", dia): {"falhas": 2},
+        ("e2", dia): {"falhas": 1},
+    }
+
+
+def test_agrupar_incrementos_com_sinal_negativo_desfaz():
+    dia = datetime(2024, 3, 10)
+    manutencao = {"equipamento_id": "e1", "tipo": "corretiva", "status": "pendente", "created_at": dia}
+    assert agrupar_incrementos([manutencao], sinal=-1) == {("e1", dia): {"falhas": -1}}
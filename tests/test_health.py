@@ -0,0 +1,25 @@
+from types import SimpleNamespace
+
+from server import PoolMonitor
+
+
+def evento(endereco):
+    return SimpleNamespace(address=endereco)
+
+
+def test_saturacao_usa_o_servidor_mais_ocupado():
+    monitor = PoolMonitor()
+    for _ in range(3):
+        monitor.connection_checked_out(evento(("a", 27017)))
+    monitor.connection_checked_out(evento(("b", 27017)))
+    resumo = monitor.resumo(tamanho_pool=4)
+    assert resumo["em_uso"] == 4
+    assert resumo["saturacao"] == 0.75
+
+
+def test_checkin_e_pool_cleared_nao_ficam_negativos():
+    monitor = PoolMonitor()
+    monitor.connection_checked_in(evento(("a", 27017)))
+    monitor.connection_checked_out(evento(("a", 27017)))
+    monitor.pool_cleared(evento(("a", 27017)))
+    assert monitor.resumo(tamanho_pool=10)["em_uso"] == 0
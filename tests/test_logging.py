@@ -0,0 +1,46 @@
+import logging
+
+import server
+from server import LimiteTaxaLogFilter
+
+
+def registro(msg: str, criado_em: float, nivel: int = logging.ERROR) -> logging.LogRecord:
+    record = logging.LogRecord("teste", nivel, __file__, 1, msg, ("x",), None)
+    record.created = criado_em
+    return record
+
+
+def test_limite_por_template_dentro_da_janela():
+    filtro = LimiteTaxaLogFilter(limite=2, janela=10)
+    antes = server.logs_descartados["limite_taxa"]
+    resultados = [filtro.filter(registro("Erro %s", 100 + i)) for i in range(4)]
+    assert resultados == [True, True, False, False]
+    assert server.logs_descartados["limite_taxa"] - antes == 2
+
+
+def test_janela_nova_libera_o_template():
+    filtro = LimiteTaxaLogFilter(limite=1, janela=10)
+    assert filtro.filter(registro("Erro %s", 100))
+    assert not filtro.filter(registro("Erro %s", 105))
+    assert filtro.filter(registro("Erro %s", 110))
+
+
+def test_templates_e_niveis_diferentes_tem_contagens_separadas():
+    filtro = LimiteTaxaLogFilter(limite=1, janela=10)
+    assert filtro.filter(registro("Erro A %s", 100))
+    assert filtro.filter(registro("Erro B %s", 100))
+    assert filtro.filter(registro("Erro A %s", 100, nivel=logging.WARNING))
+    assert not filtro.filter(registro("Erro A %s", 101))
+
+
+def test_access_log_do_uvicorn_nao_e_limitado():
+    filtro = LimiteTaxaLogFilter(limite=2, janela=10)
+    antes = server.logs_descartados["limite_taxa"]
+    for i in range(100):
+        record = logging.LogRecord(
+            "uvicorn.access", logging.INFO, __file__, 1,
+            '%s - "%s %s HTTP/%s" %d', ("127.0.0.1:1", "GET", f"/api/{i}", "1.1", 200), None,
+        )
+        record.created = 100 + i / 100
+        assert filtro.filter(record)
+    assert server.logs_descartados["limite_taxa"] == antes
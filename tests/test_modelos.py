@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import pytest
+from pydantic import ValidationError
+
+from migrate_documents import normalizar
+from server import Equipamento, Manutencao, manutencoes_adapter, para_utc
+
+
+def test_para_utc_converte_data_com_fuso_para_utc_sem_fuso():
+    data = datetime.fromisoformat("2024-03-10T22:00:00-03:00")
+    assert para_utc(data) == datetime(2024, 3, 11, 1, 0)
+    assert para_utc(datetime(2024, 3, 10)) == datetime(2024, 3, 10)
+
+
+def test_data_iso_com_fuso_vira_utc_sem_fuso():
+    manutencao = Manutencao(equipamento_id="e1", data_prevista="2024-03-10T22:00:00Z")
+    assert manutencao.data_prevista == datetime(2024, 3, 10, 22, 0)
+    assert manutencao.data_prevista.tzinfo is None
+
+
+def test_campos_desconhecidos_sao_descartados():
+    equipamento = Equipamento(nome="Monitor", campo_qualquer="x")
+    assert "campo_qualquer" not in equipamento.model_dump()
+
+
+def test_texto_acima_do_limite_e_rejeitado():
+    with pytest.raises(ValidationError):
+        Equipamento(nome="x" * 201)
+
+
+def test_lote_aponta_o_indice_do_item_invalido():
+    with pytest.raises(ValidationError) as erro:
+        manutencoes_adapter.validate_python([{"equipamento_id": "e1"}, {"descricao": "sem equipamento"}])
+    assert erro.value.errors()[0]["loc"] == (1, "equipamento_id")
+
+
+def test_normalizar_nao_inventa_valores_padrao():
+    documento = {
+        "_id": 1,
+        "id": "m1",
+        "equipamento_id": "e1",
+        "data_prevista": "2024-01-01T12:00:00+00:00",
+        "campo_legado": "x",
+    }
+    normalizado = normalizar(documento, Manutencao)
+    assert normalizado == {
+        "_id": 1,
+        "id": "m1",
+        "equipamento_id": "e1",
+        "data_prevista": datetime(2024, 1, 1, 12, 0),
+    }
+    assert "status" not in normalizado and "tipo" not in normalizado
+
+
+def test_normalizar_converte_datas_de_controle():
+    documento = {"_id": 1, "nome": "Monitor", "created_at": "2024-01-01T00:00:00Z"}
+    assert normalizar(documento, Equipamento)["created_at"] == datetime(2024, 1, 1)
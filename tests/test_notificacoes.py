@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import server
+from server import agendar_notificacao, transicoes_devidas
+
+
+@pytest.fixture(autouse=True)
+def heap_limpo():
+    server.notificacao_heap.clear()
+    server.notificacao_prazos.clear()
+    yield
+    server.notificacao_heap.clear()
+    server.notificacao_prazos.clear()
+
+
+def test_prazo_futuro_gera_proxima_e_depois_vencida():
+    prazo = (datetime.utcnow() + timedelta(days=30)).replace(microsecond=0)
+    agendar_notificacao({"id": "m1", "status": "pendente", "data_prevista": prazo})
+    inicio_janela = prazo - timedelta(days=server.NOTIFICACAO_JANELA_DIAS)
+
+    assert transicoes_devidas(inicio_janela - timedelta(seconds=1)) == []
+    assert transicoes_devidas(inicio_janela) == [("m1", "proxima", prazo)]
+    assert transicoes_devidas(prazo - timedelta(seconds=1)) == []
+    assert transicoes_devidas(prazo) == [("m1", "vencida", prazo)]
+    assert server.notificacao_heap == []
+
+
+def test_prazo_vencido_gera_somente_vencida():
+    prazo = datetime.utcnow() - timedelta(days=1)
+    agendar_notificacao({"id": "m1", "status": "pendente", "data_prevista": prazo.isoformat()})
+    assert transicoes_devidas(datetime.utcnow()) == [("m1", "vencida", prazo)]
+
+
+def test_conclusao_torna_entradas_orfas():
+    prazo = datetime.utcnow() + timedelta(days=1)
+    agendar_notificacao({"id": "m1", "status": "pendente", "data_prevista": prazo})
+    agendar_notificacao({"id": "m1", "status": "concluida", "data_prevista": prazo})
+    assert transicoes_devidas(prazo + timedelta(days=1)) == []
+
+
+def test_novo_prazo_ignora_entradas_do_prazo_antigo():
+    antigo = datetime.utcnow() + timedelta(days=1)
+    novo = datetime.utcnow() + timedelta(days=20)
+    agendar_notificacao({"id": "m1", "status": "pendente", "data_prevista": antigo})
+    agendar_notificacao({"id": "m1", "status": "pendente", "data_prevista": novo})
+    assert transicoes_devidas(antigo + timedelta(days=1)) == []
+    assert transicoes_devidas(novo) == [("m1", "proxima", novo), ("m1", "vencida", novo)]
+
+
+def test_sem_data_prevista_nao_agenda():
+    agendar_notificacao({"id": "m1", "status": "pendente"})
+    assert server.notificacao_heap == []
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from server import codificar_token_sync, decodificar_token_sync, intercalar_mudancas
+
+FONTES = ("equipamentos", "manutencoes", "sync_tombstones")
+
+
+def test_token_sync_ida_e_volta():
+    momento = datetime(2024, 5, 1, 12, 30, 15, 123000)
+    token = codificar_token_sync(momento, "abc")
+    assert decodificar_token_sync(token) == (momento, "abc")
+
+
+def test_token_sync_invalido_gera_400():
+    with pytest.raises(HTTPException) as erro:
+        decodificar_token_sync("nao-e-um-token")
+    assert erro.value.status_code == 400
+
+
+def test_intercala_por_updated_at_e_id():
+    t1, t2 = datetime(2024, 1, 1), datetime(2024, 1, 2)
+    resultados = [
+        [{"id": "e2", "updated_at": t2}],
+        [{"id": "m1", "updated_at": t1}, {"id": "m3", "updated_at": t2}],
+        [{"id": "e1", "colecao": "equipamentos", "updated_at": t1}],
+    ]
+    resposta, proximo, tem_mais = intercalar_mudancas(FONTES, resultados, limite=10)
+    assert [d["id"] for d in resposta["equipamentos"]] == ["e2"]
+    assert [d["id"] for d in resposta["manutencoes"]] == ["m1", "m3"]
+    assert resposta["removidos"] == [{"colecao": "equipamentos", "id": "e1"}]
+    assert decodificar_token_sync(proximo) == (t2, "m3")
+    assert tem_mais is False
+
+
+def test_corte_no_limite_marca_tem_mais_e_token_do_ultimo_item():
+    t = datetime(2024, 1, 1)
+    resultados = [
+        [{"id": "a", "updated_at": t}, {"id": "c", "updated_at": t}],
+        [{"id": "b", "updated_at": t}],
+        [],
+    ]
+    resposta, proximo, tem_mais = intercalar_mudancas(FONTES, resultados, limite=2)
+    assert [d["id"] for d in resposta["equipamentos"]] == ["a"]
+    assert [d["id"] for d in resposta["manutencoes"]] == ["b"]
+    assert decodificar_token_sync(proximo) == (t, "b")
+    assert tem_mais is True
+
+
+def test_sem_mudancas_nao_gera_token():
+    resposta, proximo, tem_mais = intercalar_mudancas(FONTES, [[], [], []], limite=5)
+    assert proximo is None
+    assert tem_mais is False
+    assert resposta == {"equipamentos": [], "manutencoes": [], "removidos": []}